@@ -1,24 +1,71 @@
 from __future__ import annotations
 
-import argparse
+import atexit
+import functools
 import json
 import logging
 import os
+import queue
 import re
+import stat
 import subprocess
 import sys
+import threading
 import time
-from dataclasses import dataclass, field
-from logging.handlers import RotatingFileHandler
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from string import Template
-from typing import Any
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+if TYPE_CHECKING:
+    # Annotation-only names; the runtime imports stay lazy (argparse inside
+    # build_parser, Template inside _load_prompt_template).
+    import argparse
+    from string import Template
 
 try:
     import tomllib  # pyright: ignore[reportMissingImports]
 except ModuleNotFoundError:  # pragma: no cover
     import tomli as tomllib  # type: ignore
 
+# Optional native TOML parsers (~5x faster than tomllib); install via
+# `pip install fix-my-claw[fast]`. Falls back to the stdlib parser.
+try:
+    import rtoml  # pyright: ignore[reportMissingImports]
+
+    def _toml_parse(p: "Path") -> dict:
+        return rtoml.loads(p.read_text(encoding="utf-8"))
+
+except ModuleNotFoundError:  # pragma: no cover
+    try:
+        import pytomlpp  # pyright: ignore[reportMissingImports]
+
+        def _toml_parse(p: "Path") -> dict:
+            return pytomlpp.loads(p.read_text(encoding="utf-8"))
+
+    except ModuleNotFoundError:
+
+        def _toml_parse(p: "Path") -> dict:
+            # Binary mode: tomllib.load does the UTF-8 decode inside the
+            # parse instead of materializing an intermediate str first.
+            with p.open("rb") as f:
+                return tomllib.load(f)
+
+# Optional fast JSON encoder (also from the `fast` extra) for --json output.
+try:
+    import orjson  # pyright: ignore[reportMissingImports]
+
+    def _json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode("utf-8")
+
+except ModuleNotFoundError:  # pragma: no cover
+
+    def _json_dumps(obj: Any) -> str:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
 log = logging.getLogger("fix_my_claw")
 
 DEFAULT_CONFIG_PATH = "~/.fix-my-claw/config.toml"
@@ -77,46 +124,166 @@ args_code = [
 """
 
 
+# dataclass(slots=True) needs Python 3.10+; on 3.9 we fall back to plain
+# frozen dataclasses instead of raising the interpreter floor.
+_DC_SLOTS: dict[str, bool] = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
 def _expand_path(value: str) -> str:
+    # Literal absolute paths (the common case) skip both expansion passes.
+    if "~" not in value and "$" not in value:
+        return value
     return os.path.expanduser(os.path.expandvars(value))
 
 
 def _as_path(value: str) -> Path:
-    return Path(_expand_path(value)).resolve()
+    # No .resolve() here: canonicalization costs a realpath syscall per path
+    # and nothing downstream needs symlinks resolved at parse time.
+    return Path(_expand_path(value))
 
 
 def ensure_dir(path: Path) -> None:
     path.mkdir(parents=True, exist_ok=True)
 
 
+# Sentinel for "caller did not pass a cwd; stat the workspace dir yourself".
+_CWD_UNSET: Any = object()
+
+
+def _dir_or_none(path: Path) -> Path | None:
+    """Return ``path`` if it is an existing directory, else ``None``.
+
+    One os.stat call, versus the two syscalls of an exists()+is_dir() pair;
+    used to pick the subprocess cwd for probes and repair steps.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return path if stat.S_ISDIR(st.st_mode) else None
+
+
+# Default paths expanded once at import; building them per dataclass default
+# would re-run expanduser/expandvars/resolve (syscalls) on every construction.
+_DEFAULT_FMC_DIR = _as_path("~/.fix-my-claw")
+_DEFAULT_FMC_LOG = _as_path("~/.fix-my-claw/fix-my-claw.log")
+_DEFAULT_OC_DIR = _as_path("~/.openclaw")
+_DEFAULT_OC_WS = _as_path("~/.openclaw/workspace")
+
+
+# Canonical default argv tuples, shared by the dataclass defaults and the
+# parser defaults so neither re-allocates them per construction.
+_HEALTH_ARGS = ("gateway", "health", "--json")
+_STATUS_ARGS = ("gateway", "status", "--json")
+_LOGS_ARGS = ("logs", "--tail", "200")
+_OFFICIAL_STEPS = (
+    ("openclaw", "doctor", "--repair"),
+    ("openclaw", "gateway", "restart"),
+)
+
+
 def truncate_for_log(s: str, limit: int = 8000) -> str:
     if len(s) <= limit:
         return s
     return s[: limit - 20] + f"\n...[truncated {len(s) - limit} chars]"
 
 
-_SECRET_PATTERNS = [
-    r"\bsk-[A-Za-z0-9]{16,}\b",
-]
+# All redaction rules fused into one alternation so every blob is scanned
+# once, however many token families are added; branches dispatch on
+# ``lastgroup`` in the sub callback. Scoped (?i:...) keeps the key=value and
+# Bearer branches case-insensitive without loosening the token prefixes.
+# The Bearer branch backs off (lookahead) when the following word is itself
+# a ``key=value`` key, so it cannot swallow text the key=value branch would
+# redact (``Bearer token=...`` must still lose the value).
+# The value captures are unbounded on purpose: each is a single character
+# class, which cannot backtrack superlinearly, and a cap would leave the
+# tail of an oversized value (large JWTs clear 4KiB) in cleartext.
+_REDACT_RE = re.compile(
+    r'(?i:\b(?P<kv_key>api[_-]?key|token|secret|password)\b(?P<kv_sep>\s*[:=]\s*))(?P<kv_val>[^\s"\'`]+)'
+    r"|(?i:\b(?P<bearer>Bearer))\s+(?![A-Za-z0-9._\\-]*\s*[:=])[A-Za-z0-9._\\-]+"
+    r"|\b(?P<tok>sk-[A-Za-z0-9]{16,}|ghp_[A-Za-z0-9]{16,}|AKIA[A-Z0-9]{16})\b"
+)
+
+# Replacement prefixes for the token-family branch, keyed on the first
+# character (s/g/A are distinct across the current families).
+_TOK_REPL = {"s": "sk-***", "g": "ghp_***", "A": "AKIA***"}
+
+
+def _redact_sub(m: "re.Match[str]") -> str:
+    g = m.lastgroup
+    if g == "kv_val":
+        return m.group("kv_key") + m.group("kv_sep") + "***"
+    if g == "bearer":
+        return m.group("bearer") + " ***"
+    return _TOK_REPL[m.group("tok")[0]]
 
 
 def redact_text(text: str) -> str:
-    out = text
-    out = re.sub(
-        r'(?i)\b(api[_-]?key|token|secret|password)\b(\s*[:=]\s*)([^\s"\'`]+)',
-        r"\1\2***",
-        out,
-    )
-    out = re.sub(r"(?i)\b(Bearer)\s+([A-Za-z0-9._\\-]+)", r"\1 ***", out)
-    for pat in _SECRET_PATTERNS:
-        out = re.sub(pat, "sk-***", out)
-    return out
+    return _REDACT_RE.sub(_redact_sub, text)
+
+
+# Cached factory keeps logging.handlers off the import-time path; the class
+# body only needs the base class once file logging is actually requested.
+@functools.lru_cache(maxsize=1)
+def _fast_rotating_handler_cls() -> type:
+    from logging.handlers import RotatingFileHandler
+
+    class _FastRotatingFileHandler(RotatingFileHandler):
+        """RotatingFileHandler that tracks the file size itself.
+
+        The stock shouldRollover calls ``stream.tell()`` — a seek syscall —
+        for every record. Cache the byte position when the stream opens and
+        advance it per record instead; only the rollover comparison runs per
+        emit. The char-length approximation of the encoded size keeps the
+        rollover point within a few bytes of maxBytes, which is all the cap
+        is for.
+        """
+
+        _pos = 0
+        _msg_len = 0
+
+        def _open(self):
+            stream = super()._open()
+            try:
+                self._pos = stream.seek(0, os.SEEK_END)
+            except (OSError, ValueError):
+                self._pos = 0
+            return stream
+
+        def shouldRollover(self, record: logging.LogRecord) -> bool:
+            if self.maxBytes <= 0:
+                return False
+            if self.stream is None:
+                self.stream = self._open()
+            self._msg_len = len(self.format(record)) + len(self.terminator)
+            return self._pos + self._msg_len >= self.maxBytes
+
+        def emit(self, record: logging.LogRecord) -> None:
+            # _pos advances after the write so a rollover (which reopens the
+            # stream and resets _pos) still accounts for the record that
+            # lands in the fresh file.
+            super().emit(record)
+            self._pos += self._msg_len
+
+    return _FastRotatingFileHandler
 
 
-def setup_logging(cfg: "AppConfig") -> None:
-    ensure_dir(cfg.monitor.state_dir)
-    ensure_dir(cfg.monitor.log_file.parent)
+# Tracks the file_logging mode logging was last configured with, so repeated
+# setup_logging calls in one process (e.g. several cmd_* invocations under
+# tests) don't rebuild handlers and re-open the rotating log file.
+_LOGGING_MODE: bool | None = None
 
+
+def setup_logging(cfg: "AppConfig", *, file_logging: bool = True) -> None:
+    """Configure console logging, plus the rotating log file when requested.
+
+    One-shot commands like ``check`` pass ``file_logging=False`` to skip the
+    state-dir mkdir and log-file open they would otherwise pay on every
+    scheduled invocation.
+    """
+    global _LOGGING_MODE
+    if _LOGGING_MODE == file_logging:
+        return
     level = getattr(logging, cfg.monitor.log_level.upper(), logging.INFO)
     root = logging.getLogger()
     root.setLevel(level)
@@ -126,168 +293,332 @@ def setup_logging(cfg: "AppConfig") -> None:
         datefmt="%Y-%m-%d %H:%M:%S",
     )
 
-    file_handler = RotatingFileHandler(
-        cfg.monitor.log_file,
-        maxBytes=5 * 1024 * 1024,
-        backupCount=5,
-        encoding="utf-8",
-    )
-    file_handler.setLevel(level)
-    file_handler.setFormatter(fmt)
-
     stream_handler = logging.StreamHandler()
     stream_handler.setLevel(level)
     stream_handler.setFormatter(fmt)
 
     root.handlers.clear()
-    root.addHandler(file_handler)
     root.addHandler(stream_handler)
 
+    if file_logging:
+        ensure_dir(cfg.monitor.state_dir)
+        ensure_dir(cfg.monitor.log_file.parent)
+        file_handler = _fast_rotating_handler_cls()(
+            cfg.monitor.log_file,
+            maxBytes=5 * 1024 * 1024,
+            backupCount=5,
+            encoding="utf-8",
+        )
+        file_handler.setLevel(level)
+        file_handler.setFormatter(fmt)
+        root.addHandler(file_handler)
 
-@dataclass(frozen=True)
-class MonitorConfig:
+    _LOGGING_MODE = file_logging
+
+
+# NamedTuple rather than a dataclass: interval_seconds/probe_timeout_seconds
+# are read every monitor-loop iteration and tuple-slot access is the cheapest
+# attribute read CPython offers.
+class MonitorConfig(NamedTuple):
     interval_seconds: int = 60
     probe_timeout_seconds: int = 15
     repair_cooldown_seconds: int = 300
-    state_dir: Path = field(default_factory=lambda: _as_path("~/.fix-my-claw"))
-    log_file: Path = field(default_factory=lambda: _as_path("~/.fix-my-claw/fix-my-claw.log"))
+    state_dir: Path = _DEFAULT_FMC_DIR
+    log_file: Path = _DEFAULT_FMC_LOG
     log_level: str = "INFO"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, **_DC_SLOTS)
 class OpenClawConfig:
     command: str = "openclaw"
-    state_dir: Path = field(default_factory=lambda: _as_path("~/.openclaw"))
-    workspace_dir: Path = field(default_factory=lambda: _as_path("~/.openclaw/workspace"))
-    health_args: list[str] = field(default_factory=lambda: ["gateway", "health", "--json"])
-    status_args: list[str] = field(default_factory=lambda: ["gateway", "status", "--json"])
-    logs_args: list[str] = field(default_factory=lambda: ["logs", "--tail", "200"])
+    state_dir: Path = _DEFAULT_OC_DIR
+    workspace_dir: Path = _DEFAULT_OC_WS
+    health_args: tuple[str, ...] = _HEALTH_ARGS
+    status_args: tuple[str, ...] = _STATUS_ARGS
+    logs_args: tuple[str, ...] = _LOGS_ARGS
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, **_DC_SLOTS)
 class RepairConfig:
     enabled: bool = True
-    official_steps: list[list[str]] = field(
-        default_factory=lambda: [
-            ["openclaw", "doctor", "--repair"],
-            ["openclaw", "gateway", "restart"],
-        ]
-    )
+    official_steps: tuple[tuple[str, ...], ...] = _OFFICIAL_STEPS
     step_timeout_seconds: int = 600
     post_step_wait_seconds: int = 2
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, **_DC_SLOTS)
 class AiConfig:
     enabled: bool = False
     provider: str = "codex"  # optional/for humans; command+args are what we actually execute
     command: str = "codex"
     # args supports placeholders: $workspace_dir, $openclaw_state_dir, $monitor_state_dir
-    args: list[str] = field(
-        default_factory=lambda: [
-            "exec",
-            "-s",
-            "workspace-write",
-            "-c",
-            'approval_policy="never"',
-            "--skip-git-repo-check",
-            "-C",
-            "$workspace_dir",
-            "--add-dir",
-            "$openclaw_state_dir",
-            "--add-dir",
-            "$monitor_state_dir",
-        ]
+    args: tuple[str, ...] = (
+        "exec",
+        "-s",
+        "workspace-write",
+        "-c",
+        'approval_policy="never"',
+        "--skip-git-repo-check",
+        "-C",
+        "$workspace_dir",
+        "--add-dir",
+        "$openclaw_state_dir",
+        "--add-dir",
+        "$monitor_state_dir",
     )
     model: str | None = None
     timeout_seconds: int = 1800
     max_attempts_per_day: int = 2
     cooldown_seconds: int = 3600
     allow_code_changes: bool = False
-    args_code: list[str] = field(
-        default_factory=lambda: [
-            "exec",
-            "-s",
-            "danger-full-access",
-            "-c",
-            'approval_policy="never"',
-            "--skip-git-repo-check",
-            "-C",
-            "$workspace_dir",
-        ]
+    args_code: tuple[str, ...] = (
+        "exec",
+        "-s",
+        "danger-full-access",
+        "-c",
+        'approval_policy="never"',
+        "--skip-git-repo-check",
+        "-C",
+        "$workspace_dir",
     )
 
 
-@dataclass(frozen=True)
+# Fully rendered argv tuples, pure functions of the config. Materialized once
+# per AppConfig so probes and official steps stop rebuilding
+# [command, *args] lists and re-running the step[0] == "openclaw"
+# substitution on every call.
+@dataclass(frozen=True, **_DC_SLOTS)
+class ResolvedCmds:
+    health: tuple[str, ...]
+    status: tuple[str, ...]
+    logs: tuple[str, ...]
+    official: tuple[tuple[str, ...], ...]
+
+
+@dataclass(frozen=True, **_DC_SLOTS)
 class AppConfig:
     monitor: MonitorConfig = field(default_factory=MonitorConfig)
     openclaw: OpenClawConfig = field(default_factory=OpenClawConfig)
     repair: RepairConfig = field(default_factory=RepairConfig)
     ai: AiConfig = field(default_factory=AiConfig)
+    resolved: ResolvedCmds = field(init=False, compare=False)
+
+    def __post_init__(self) -> None:
+        oc = self.openclaw
+        official = tuple(
+            (oc.command, *step[1:]) if step and step[0] == "openclaw" else tuple(step)
+            for step in self.repair.official_steps
+        )
+        object.__setattr__(
+            self,
+            "resolved",
+            ResolvedCmds(
+                health=(oc.command, *oc.health_args),
+                status=(oc.command, *oc.status_args),
+                logs=(oc.command, *oc.logs_args),
+                official=official,
+            ),
+        )
 
 
-def _get(d: dict[str, Any], key: str, default: Any) -> Any:
-    v = d.get(key, default)
-    return default if v is None else v
+# Per-section defaults merged under the raw TOML tables. tomllib already
+# returns correctly typed values (ints, bools, strings, lists), so the
+# parsers below only post-process path fields instead of coercing per field.
+_MONITOR_DEFAULTS: dict[str, Any] = {
+    "interval_seconds": 60,
+    "probe_timeout_seconds": 15,
+    "repair_cooldown_seconds": 300,
+    "state_dir": "~/.fix-my-claw",
+    "log_file": "~/.fix-my-claw/fix-my-claw.log",
+    "log_level": "INFO",
+}
+
+_OPENCLAW_DEFAULTS: dict[str, Any] = {
+    "command": "openclaw",
+    "state_dir": "~/.openclaw",
+    "workspace_dir": "~/.openclaw/workspace",
+    "health_args": _HEALTH_ARGS,
+    "status_args": _STATUS_ARGS,
+    "logs_args": _LOGS_ARGS,
+}
+
+_REPAIR_DEFAULTS: dict[str, Any] = {
+    "enabled": True,
+    "official_steps": _OFFICIAL_STEPS,
+    "step_timeout_seconds": 600,
+    "post_step_wait_seconds": 2,
+}
 
 
 def _parse_monitor(raw: dict[str, Any]) -> MonitorConfig:
+    d = {**_MONITOR_DEFAULTS, **raw}
     return MonitorConfig(
-        interval_seconds=int(_get(raw, "interval_seconds", 60)),
-        probe_timeout_seconds=int(_get(raw, "probe_timeout_seconds", 15)),
-        repair_cooldown_seconds=int(_get(raw, "repair_cooldown_seconds", 300)),
-        state_dir=_as_path(str(_get(raw, "state_dir", "~/.fix-my-claw"))),
-        log_file=_as_path(str(_get(raw, "log_file", "~/.fix-my-claw/fix-my-claw.log"))),
-        log_level=str(_get(raw, "log_level", "INFO")),
+        interval_seconds=d["interval_seconds"],
+        probe_timeout_seconds=d["probe_timeout_seconds"],
+        repair_cooldown_seconds=d["repair_cooldown_seconds"],
+        state_dir=_as_path(str(d["state_dir"])),
+        log_file=_as_path(str(d["log_file"])),
+        log_level=d["log_level"],
     )
 
 
 def _parse_openclaw(raw: dict[str, Any]) -> OpenClawConfig:
+    d = {**_OPENCLAW_DEFAULTS, **raw}
     return OpenClawConfig(
-        command=str(_get(raw, "command", "openclaw")),
-        state_dir=_as_path(str(_get(raw, "state_dir", "~/.openclaw"))),
-        workspace_dir=_as_path(str(_get(raw, "workspace_dir", "~/.openclaw/workspace"))),
-        health_args=list(_get(raw, "health_args", ["gateway", "health", "--json"])),
-        status_args=list(_get(raw, "status_args", ["gateway", "status", "--json"])),
-        logs_args=list(_get(raw, "logs_args", ["logs", "--tail", "200"])),
+        command=d["command"],
+        state_dir=_as_path(str(d["state_dir"])),
+        workspace_dir=_as_path(str(d["workspace_dir"])),
+        health_args=tuple(d["health_args"]),
+        status_args=tuple(d["status_args"]),
+        logs_args=tuple(d["logs_args"]),
     )
 
 
 def _parse_repair(raw: dict[str, Any]) -> RepairConfig:
+    d = {**_REPAIR_DEFAULTS, **raw}
     return RepairConfig(
-        enabled=bool(_get(raw, "enabled", True)),
-        official_steps=[list(x) for x in _get(raw, "official_steps", RepairConfig().official_steps)],
-        step_timeout_seconds=int(_get(raw, "step_timeout_seconds", 600)),
-        post_step_wait_seconds=int(_get(raw, "post_step_wait_seconds", 2)),
+        enabled=d["enabled"],
+        official_steps=tuple(tuple(x) for x in d["official_steps"]),
+        step_timeout_seconds=d["step_timeout_seconds"],
+        post_step_wait_seconds=d["post_step_wait_seconds"],
     )
 
 
+# Built once: _parse_ai only reads defaults off it, and constructing a full
+# AiConfig per load_config call was wasted work.
+_AI_DEFAULT = AiConfig()
+
+
 def _parse_ai(raw: dict[str, Any]) -> AiConfig:
-    cfg = AiConfig()
+    cfg = _AI_DEFAULT
     return AiConfig(
-        enabled=bool(_get(raw, "enabled", cfg.enabled)),
-        provider=str(_get(raw, "provider", cfg.provider)),
-        command=str(_get(raw, "command", cfg.command)),
-        args=list(_get(raw, "args", cfg.args)),
-        model=_get(raw, "model", cfg.model),
-        timeout_seconds=int(_get(raw, "timeout_seconds", cfg.timeout_seconds)),
-        max_attempts_per_day=int(_get(raw, "max_attempts_per_day", cfg.max_attempts_per_day)),
-        cooldown_seconds=int(_get(raw, "cooldown_seconds", cfg.cooldown_seconds)),
-        allow_code_changes=bool(_get(raw, "allow_code_changes", cfg.allow_code_changes)),
-        args_code=list(_get(raw, "args_code", cfg.args_code)),
+        enabled=raw.get("enabled", cfg.enabled),
+        provider=raw.get("provider", cfg.provider),
+        command=raw.get("command", cfg.command),
+        args=tuple(raw.get("args", cfg.args)),
+        model=raw.get("model", cfg.model),
+        timeout_seconds=raw.get("timeout_seconds", cfg.timeout_seconds),
+        max_attempts_per_day=raw.get("max_attempts_per_day", cfg.max_attempts_per_day),
+        cooldown_seconds=raw.get("cooldown_seconds", cfg.cooldown_seconds),
+        allow_code_changes=raw.get("allow_code_changes", cfg.allow_code_changes),
+        args_code=tuple(raw.get("args_code", cfg.args_code)),
+    )
+
+
+def _resolve_ai_placeholders(
+    ai: AiConfig, *, monitor: MonitorConfig, openclaw: OpenClawConfig
+) -> AiConfig:
+    """Substitute $workspace_dir etc. into the AI arg vectors once at load.
+
+    The placeholder values are fixed for the lifetime of a config, so doing
+    this here means repair attempts reuse frozen, fully rendered argv tuples.
+    """
+    from string import Template
+
+    mapping = {
+        "workspace_dir": str(openclaw.workspace_dir),
+        "openclaw_state_dir": str(openclaw.state_dir),
+        "monitor_state_dir": str(monitor.state_dir),
+    }
+    return replace(
+        ai,
+        args=tuple(Template(x).safe_substitute(mapping) for x in ai.args),
+        args_code=tuple(Template(x).safe_substitute(mapping) for x in ai.args_code),
     )
 
 
+# Parsed configs memoized by (path, mtime_ns, size): repeated loads of an
+# unchanged file skip the TOML parse, and edits invalidate automatically.
+_CFG_CACHE: dict[tuple[str, int, int], AppConfig] = {}
+
+# Bump when AppConfig's shape changes so stale snapshots are ignored.
+_SNAPSHOT_VERSION = 3
+
+
+def _snapshot_path(config_path: Path) -> Path:
+    return config_path.with_name(config_path.name + ".pkl")
+
+
+def _write_snapshot(p: Path, st: os.stat_result, cfg: AppConfig) -> Path:
+    import pickle
+
+    snap = _snapshot_path(p)
+    tmp = snap.with_suffix(snap.suffix + ".tmp")
+    tmp.write_bytes(pickle.dumps((_SNAPSHOT_VERSION, st.st_mtime_ns, st.st_size, cfg)))
+    tmp.replace(snap)
+    return snap
+
+
+def write_config_snapshot(path: str) -> Path:
+    """Pre-bake the parsed config into a pickle sidecar next to the TOML.
+
+    ``load_config`` deserializes the snapshot in one shot instead of
+    re-parsing TOML and rebuilding the dataclass tree, as long as the TOML
+    file's mtime/size still match.
+    """
+    p = _as_path(path)
+    cfg = load_config(str(p))
+    return _write_snapshot(p, p.stat(), cfg)
+
+
+def _load_config_snapshot(p: Path, st: os.stat_result) -> AppConfig | None:
+    import pickle
+
+    try:
+        payload = pickle.loads(_snapshot_path(p).read_bytes())
+    except Exception:
+        return None
+    if not (isinstance(payload, tuple) and len(payload) == 4):
+        return None
+    version, mtime_ns, size, cfg = payload
+    if version != _SNAPSHOT_VERSION or mtime_ns != st.st_mtime_ns or size != st.st_size:
+        return None
+    return cfg if isinstance(cfg, AppConfig) else None
+
+
 def load_config(path: str) -> AppConfig:
     p = _as_path(path)
     if not p.exists():
         raise FileNotFoundError(f"config not found: {p}")
-    data = tomllib.loads(p.read_text(encoding="utf-8"))
-    monitor = _parse_monitor(dict(data.get("monitor", {})))
-    openclaw = _parse_openclaw(dict(data.get("openclaw", {})))
-    repair = _parse_repair(dict(data.get("repair", {})))
-    ai = _parse_ai(dict(data.get("ai", {})))
-    return AppConfig(monitor=monitor, openclaw=openclaw, repair=repair, ai=ai)
+    st = p.stat()
+    key = (str(p), st.st_mtime_ns, st.st_size)
+    cached = _CFG_CACHE.get(key)
+    if cached is not None:
+        return cached
+    snapshot = _load_config_snapshot(p, st)
+    if snapshot is not None:
+        _CFG_CACHE.clear()
+        _CFG_CACHE[key] = snapshot
+        return snapshot
+    data = _toml_parse(p)
+    monitor = _parse_monitor(data.get("monitor") or {})
+    openclaw = _parse_openclaw(data.get("openclaw") or {})
+    repair = _parse_repair(data.get("repair") or {})
+    ai = _parse_ai(data.get("ai") or {})
+    ai = _resolve_ai_placeholders(ai, monitor=monitor, openclaw=openclaw)
+    cfg = AppConfig(monitor=monitor, openclaw=openclaw, repair=repair, ai=ai)
+    _CFG_CACHE.clear()
+    _CFG_CACHE[key] = cfg
+    # Write-through: refresh the snapshot so the next process start skips the
+    # TOML parse without anyone having to run `compile-config`. Best-effort —
+    # a read-only config dir just means the fast path stays cold.
+    try:
+        _write_snapshot(p, st, cfg)
+    except OSError:
+        pass
+    return cfg
+
+
+def reload_if_changed(path: str, current: AppConfig) -> AppConfig:
+    """Return a freshly parsed config if the file changed, else ``current``.
+
+    Cheap to call from a long-running loop: on an unchanged file this is one
+    ``stat`` plus a dict lookup.
+    """
+    try:
+        return load_config(path)
+    except (FileNotFoundError, OSError):
+        return current
 
 
 def write_default_config(path: str, *, overwrite: bool = False) -> Path:
@@ -313,6 +644,74 @@ class CmdResult:
         return self.exit_code == 0
 
 
+def _read_lines_capped(stream: Any, buf: "deque[str]") -> None:
+    for line in stream:
+        buf.append(line)
+    stream.close()
+
+
+def _run_cmd_capped(
+    argv: list[str],
+    *,
+    timeout_seconds: int,
+    cwd: Path | None,
+    env: dict[str, str] | None,
+    max_output_lines: int,
+) -> tuple[int, str, str]:
+    """Run a child keeping only the last ``max_output_lines`` of each stream.
+
+    Reader threads drain the pipes into bounded deques, so a chatty child
+    (e.g. ``openclaw logs``) never forces the whole output into RAM at once.
+    """
+    proc = subprocess.Popen(
+        argv,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        cwd=str(cwd) if cwd is not None else None,
+        env=env,
+    )
+    out_buf: deque[str] = deque(maxlen=max_output_lines)
+    err_buf: deque[str] = deque(maxlen=max_output_lines)
+    readers = [
+        threading.Thread(target=_read_lines_capped, args=(proc.stdout, out_buf), daemon=True),
+        threading.Thread(target=_read_lines_capped, args=(proc.stderr, err_buf), daemon=True),
+    ]
+    for t in readers:
+        t.start()
+    timed_out = False
+    try:
+        code = proc.wait(timeout=timeout_seconds)
+    except subprocess.TimeoutExpired:
+        timed_out = True
+        proc.kill()
+        proc.wait()
+        code = 124
+    for t in readers:
+        t.join(timeout=5)
+    out = "".join(out_buf)
+    err = "".join(err_buf)
+    if timed_out:
+        err = (err + "\n" if err else "") + f"[fix-my-claw] timeout after {timeout_seconds}s"
+    return code, out, err
+
+
+@functools.lru_cache(maxsize=16)
+def _resolve_cmd(name: str) -> str:
+    """Resolve ``name`` to an absolute executable path, once per process.
+
+    Bare command names make every exec walk PATH (one stat per entry); the
+    monitor probes openclaw each interval for the process lifetime, so the
+    lookup is cached. Falls back to the name unchanged when not found so the
+    child still produces the usual exec error.
+    """
+    import shutil
+
+    if os.sep in name:
+        return name
+    return shutil.which(name) or name
+
+
 def run_cmd(
     argv: list[str],
     *,
@@ -320,9 +719,31 @@ def run_cmd(
     cwd: Path | None = None,
     env: dict[str, str] | None = None,
     stdin_text: str | None = None,
+    max_output_lines: int | None = None,
 ) -> CmdResult:
     started = time.monotonic()
+    # An absolute argv[0] lets CPython take the posix_spawn fast path and
+    # skips the per-exec PATH walk; _resolve_cmd caches the which() lookup.
+    if argv:
+        argv = [_resolve_cmd(argv[0]), *argv[1:]]
     try:
+        if max_output_lines is not None:
+            code, out, err = _run_cmd_capped(
+                argv,
+                timeout_seconds=timeout_seconds,
+                cwd=cwd,
+                env=env,
+                max_output_lines=max_output_lines,
+            )
+            duration_ms = int((time.monotonic() - started) * 1000)
+            return CmdResult(
+                argv=list(argv),
+                cwd=cwd,
+                exit_code=code,
+                duration_ms=duration_ms,
+                stdout=out,
+                stderr=err,
+            )
         cp = subprocess.run(
             argv,
             input=stdin_text,
@@ -339,6 +760,11 @@ def run_cmd(
         code = 127
         out = ""
         err = f"[fix-my-claw] command not found: {argv[0]} ({e})"
+        # The cached resolution may point at a path that no longer exists
+        # (binary reinstalled elsewhere — possibly by our own repair stage);
+        # drop the cache so the next spawn re-walks PATH instead of wedging
+        # on 127 forever.
+        _resolve_cmd.cache_clear()
     except subprocess.TimeoutExpired as e:
         code = 124
         out = (e.stdout or "") if isinstance(e.stdout, str) else ""
@@ -361,68 +787,64 @@ def run_cmd(
 
 @dataclass
 class FileLock:
+    """Single-instance lock backed by flock(2).
+
+    The kernel releases the lock automatically when the holder exits (even on
+    SIGKILL), so there is no stale-PID probing and no unlink/create race: the
+    lock file itself is permanent and only the flock on it matters.
+    """
+
     path: Path
     _fd: int | None = None
 
     def acquire(self, *, timeout_seconds: int = 0) -> bool:
-        start = time.monotonic()
+        import fcntl
+
+        if self._fd is None:
+            self._fd = os.open(str(self.path), os.O_CREAT | os.O_RDWR, 0o600)
+        deadline = time.monotonic() + timeout_seconds
         while True:
             try:
-                fd = os.open(str(self.path), os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600)
-                os.write(fd, str(os.getpid()).encode("utf-8"))
-                self._fd = fd
-                return True
-            except FileExistsError:
-                if self._try_break_stale_lock():
-                    continue
-                if timeout_seconds <= 0:
-                    return False
-                if (time.monotonic() - start) >= timeout_seconds:
+                fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except (BlockingIOError, PermissionError):
+                if time.monotonic() >= deadline:
+                    os.close(self._fd)
+                    self._fd = None
                     return False
-                time.sleep(0.2)
-
-    def _try_break_stale_lock(self) -> bool:
-        try:
-            pid_text = self.path.read_text(encoding="utf-8").strip()
-            pid = int(pid_text) if pid_text else None
-        except Exception:
-            pid = None
-
-        if pid is None:
-            try:
-                self.path.unlink(missing_ok=True)
-                return True
-            except Exception:
-                return False
-
-        try:
-            os.kill(pid, 0)
-            return False
-        except Exception:
-            try:
-                self.path.unlink(missing_ok=True)
-                return True
-            except Exception:
-                return False
+                time.sleep(0.05)
+                continue
+            # PID is informational only (for operators poking at the file).
+            os.ftruncate(self._fd, 0)
+            os.write(self._fd, str(os.getpid()).encode("utf-8"))
+            # Graceful interpreter exits that skip the cmd_* finally blocks
+            # (sys.exit deep in a handler, unhandled exceptions) still unlock
+            # promptly; hard kills are covered by the kernel dropping the
+            # flock with the process.
+            atexit.register(self.release)
+            return True
 
     def release(self) -> None:
-        if self._fd is not None:
-            try:
-                os.close(self._fd)
-            finally:
-                self._fd = None
+        if self._fd is None:
+            return
+        import fcntl
+
+        atexit.unregister(self.release)
         try:
-            self.path.unlink(missing_ok=True)
-        except Exception:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        except OSError:
             pass
+        try:
+            os.close(self._fd)
+        finally:
+            self._fd = None
 
 
 def _now_ts() -> int:
     return int(time.time())
 
 
-def _today_ymd() -> str:
-    return time.strftime("%Y-%m-%d", time.localtime())
+def _today_ymd(now: float | None = None) -> str:
+    return time.strftime("%Y-%m-%d", time.localtime(now))
 
 
 @dataclass
@@ -454,67 +876,141 @@ class State:
 
 
 class StateStore:
+    """State persisted as JSON, with a write-through in-memory cache.
+
+    The FileLock already guarantees a single fix-my-claw instance, so after
+    the first read the on-disk file cannot change under us and every
+    load/mutate pair can run against the cached State.
+    """
+
     def __init__(self, base_dir: Path):
         self.base_dir = base_dir
         self.path = base_dir / "state.json"
+        self._cached: State | None = None
+        self._defer = False
+        self._dirty = False
+        self._last_payload: bytes | None = None
         ensure_dir(base_dir)
 
-    def load(self) -> State:
-        if not self.path.exists():
-            return State()
+    @contextmanager
+    def transaction(self):
+        """Coalesce all saves inside the block into one write at the end.
+
+        A single monitor cycle can touch the state several times (mark_ok,
+        cooldown bookkeeping, AI counters); deferring the atomic-rename write
+        to the end of the cycle keeps it to at most one per iteration.
+        """
+        if self._defer:
+            yield self
+            return
+        self._defer = True
         try:
-            data = json.loads(self.path.read_text(encoding="utf-8"))
-            return State.from_json(data if isinstance(data, dict) else {})
-        except Exception:
-            return State()
+            yield self
+        finally:
+            self._defer = False
+            if self._dirty:
+                self._dirty = False
+                self._persist(self.load())
 
-    def save(self, state: State) -> None:
+    def load(self) -> State:
+        if self._cached is not None:
+            return self._cached
+        state = State()
+        if self.path.exists():
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+                state = State.from_json(data if isinstance(data, dict) else {})
+            except Exception:
+                state = State()
+        self._cached = state
+        return state
+
+    def save(self, state: State, *, durable: bool = False) -> None:
+        """Persist ``state`` (or defer it inside a transaction).
+
+        ``durable=True`` writes through even mid-transaction: the attempt
+        markers back the cooldown and daily-cap safety limits, and must be on
+        disk before the long-running repair stages start, or a crash during
+        one would let a restarted monitor bypass them.
+        """
+        self._cached = state
+        if self._defer and not durable:
+            self._dirty = True
+            return
+        self._persist(state)
+
+    def _persist(self, state: State) -> None:
+        # Compact separators: state.json is machine-read only and this write
+        # happens every healthy interval, so pretty-printing is pure cost.
+        payload = _json_dumps(state.to_json()).encode("utf-8")
+        if payload == self._last_payload:
+            # Nothing changed since the last write; skip the tmp-write and
+            # rename entirely.
+            return
         ensure_dir(self.path.parent)
         tmp = self.path.with_suffix(".tmp")
-        tmp.write_text(json.dumps(state.to_json(), ensure_ascii=False, indent=2), encoding="utf-8")
+        tmp.write_bytes(payload)
         tmp.replace(self.path)
+        self._last_payload = payload
+
+    # The mutators accept an optional ``now`` so a repair attempt (or a loop
+    # iteration) can capture one timestamp and thread it through every state
+    # touch: fewer clock_gettime calls, and the cooldown math inside a single
+    # cycle always agrees with itself.
 
-    def mark_ok(self) -> None:
+    def mark_ok(self, *, now: int | None = None) -> None:
         s = self.load()
-        s.last_ok_ts = _now_ts()
+        s.last_ok_ts = _now_ts() if now is None else now
         self.save(s)
 
-    def can_attempt_repair(self, cooldown_seconds: int, *, force: bool) -> bool:
+    def can_attempt_repair(self, cooldown_seconds: int, *, force: bool, now: int | None = None) -> bool:
         if force:
             return True
         s = self.load()
         if s.last_repair_ts is None:
             return True
-        return (_now_ts() - s.last_repair_ts) >= cooldown_seconds
+        if now is None:
+            now = _now_ts()
+        return (now - s.last_repair_ts) >= cooldown_seconds
 
-    def mark_repair_attempt(self) -> None:
+    def mark_repair_attempt(self, *, now: int | None = None) -> None:
         s = self.load()
-        s.last_repair_ts = _now_ts()
-        self.save(s)
-
-    def can_attempt_ai(self, *, max_attempts_per_day: int, cooldown_seconds: int) -> bool:
+        s.last_repair_ts = _now_ts() if now is None else now
+        # At most one of these per cooldown window; the immediate write is
+        # cheap and keeps the cooldown enforceable across a crash.
+        self.save(s, durable=True)
+
+    def can_attempt_ai(self, *, max_attempts_per_day: int, cooldown_seconds: int, now: int | None = None) -> bool:
+        if now is None:
+            now = _now_ts()
         s = self.load()
-        today = _today_ymd()
+        today = _today_ymd(now)
         if s.ai_attempts_day != today:
+            # Roll the day over in the cache only; the FileLock guarantees no
+            # other process reads the file, and a restart would recompute the
+            # rollover from scratch anyway. mark_ai_attempt persists it.
             s.ai_attempts_day = today
             s.ai_attempts_count = 0
-            self.save(s)
 
         if s.ai_attempts_count >= max_attempts_per_day:
             return False
-        if s.last_ai_ts is not None and (_now_ts() - s.last_ai_ts) < cooldown_seconds:
+        if s.last_ai_ts is not None and (now - s.last_ai_ts) < cooldown_seconds:
             return False
         return True
 
-    def mark_ai_attempt(self) -> None:
+    def mark_ai_attempt(self, *, now: int | None = None) -> None:
+        if now is None:
+            now = _now_ts()
         s = self.load()
-        today = _today_ymd()
+        today = _today_ymd(now)
         if s.ai_attempts_day != today:
             s.ai_attempts_day = today
             s.ai_attempts_count = 0
         s.ai_attempts_count += 1
-        s.last_ai_ts = _now_ts()
-        self.save(s)
+        s.last_ai_ts = now
+        # Must hit disk before the AI stage runs: losing this marker to a
+        # crash would let a restart exceed max_attempts_per_day.
+        self.save(s, durable=True)
 
 
 @dataclass(frozen=True)
@@ -541,8 +1037,11 @@ class Probe:
 
 
 def _parse_json_maybe(stdout: str) -> dict | list | None:
-    s = stdout.strip()
-    if not s:
+    # Probes only ever emit an object or array; peeking at the first
+    # character skips the decoder (and the JSONDecodeError construction,
+    # which captures a traceback) for the common plain-text outputs.
+    s = stdout.lstrip()
+    if not s or s[0] not in "{[":
         return None
     try:
         return json.loads(s)
@@ -550,9 +1049,10 @@ def _parse_json_maybe(stdout: str) -> dict | list | None:
         return None
 
 
-def probe_health(cfg: AppConfig, *, log_on_fail: bool = True) -> Probe:
-    argv = [cfg.openclaw.command, *cfg.openclaw.health_args]
-    cwd = cfg.openclaw.workspace_dir if cfg.openclaw.workspace_dir.exists() else None
+def probe_health(cfg: AppConfig, *, log_on_fail: bool = True, cwd: Path | None = _CWD_UNSET) -> Probe:
+    argv = list(cfg.resolved.health)
+    if cwd is _CWD_UNSET:
+        cwd = _dir_or_none(cfg.openclaw.workspace_dir)
     cmd = run_cmd(argv, timeout_seconds=cfg.monitor.probe_timeout_seconds, cwd=cwd)
     data = _parse_json_maybe(cmd.stdout)
     if log_on_fail and not cmd.ok:
@@ -562,9 +1062,10 @@ def probe_health(cfg: AppConfig, *, log_on_fail: bool = True) -> Probe:
     return Probe(name="health", cmd=cmd, json_data=data)
 
 
-def probe_status(cfg: AppConfig, *, log_on_fail: bool = True) -> Probe:
-    argv = [cfg.openclaw.command, *cfg.openclaw.status_args]
-    cwd = cfg.openclaw.workspace_dir if cfg.openclaw.workspace_dir.exists() else None
+def probe_status(cfg: AppConfig, *, log_on_fail: bool = True, cwd: Path | None = _CWD_UNSET) -> Probe:
+    argv = list(cfg.resolved.status)
+    if cwd is _CWD_UNSET:
+        cwd = _dir_or_none(cfg.openclaw.workspace_dir)
     cmd = run_cmd(argv, timeout_seconds=cfg.monitor.probe_timeout_seconds, cwd=cwd)
     data = _parse_json_maybe(cmd.stdout)
     if log_on_fail and not cmd.ok:
@@ -574,10 +1075,38 @@ def probe_status(cfg: AppConfig, *, log_on_fail: bool = True) -> Probe:
     return Probe(name="status", cmd=cmd, json_data=data)
 
 
-def probe_logs(cfg: AppConfig, *, timeout_seconds: int = 15) -> CmdResult:
-    argv = [cfg.openclaw.command, *cfg.openclaw.logs_args]
-    cwd = cfg.openclaw.workspace_dir if cfg.openclaw.workspace_dir.exists() else None
-    return run_cmd(argv, timeout_seconds=timeout_seconds, cwd=cwd)
+def probe_health_and_status(
+    cfg: AppConfig, *, log_on_fail: bool = True, cwd: Path | None = _CWD_UNSET
+) -> tuple[Probe, Probe]:
+    """Run the health and status probes concurrently.
+
+    The two children are independent, so overlapping them makes the pair
+    cost the slower probe rather than the sum of both.
+    """
+    if cwd is _CWD_UNSET:
+        cwd = _dir_or_none(cfg.openclaw.workspace_dir)
+    status_box: list[Probe] = []
+    t = threading.Thread(
+        target=lambda: status_box.append(probe_status(cfg, log_on_fail=log_on_fail, cwd=cwd)),
+        name="fix-my-claw-status-probe",
+        daemon=True,
+    )
+    t.start()
+    health = probe_health(cfg, log_on_fail=log_on_fail, cwd=cwd)
+    t.join()
+    return health, status_box[0]
+
+
+# Keep at most this many lines from a log probe; the default logs_args only
+# tails 200 lines, but operators can point logs_args at much louder commands.
+_LOGS_MAX_LINES = 2000
+
+
+def probe_logs(cfg: AppConfig, *, timeout_seconds: int = 15, cwd: Path | None = _CWD_UNSET) -> CmdResult:
+    argv = list(cfg.resolved.logs)
+    if cwd is _CWD_UNSET:
+        cwd = _dir_or_none(cfg.openclaw.workspace_dir)
+    return run_cmd(argv, timeout_seconds=timeout_seconds, cwd=cwd, max_output_lines=_LOGS_MAX_LINES)
 
 
 @dataclass(frozen=True)
@@ -591,8 +1120,8 @@ class CheckResult:
 
 
 def run_check(cfg: AppConfig, store: StateStore) -> CheckResult:
-    h = probe_health(cfg)
-    s = probe_status(cfg)
+    wd = _dir_or_none(cfg.openclaw.workspace_dir)
+    h, s = probe_health_and_status(cfg, cwd=wd)
     healthy = h.ok and s.ok
     if healthy:
         store.mark_ok()
@@ -615,31 +1144,112 @@ class RepairResult:
         }
 
 
-def _attempt_dir(cfg: AppConfig) -> Path:
-    ts = time.strftime("%Y%m%d-%H%M%S", time.localtime())
+def _attempt_dir(cfg: AppConfig, *, now: float | None = None) -> Path:
+    ts = time.strftime("%Y%m%d-%H%M%S", time.localtime(now))
     d = cfg.monitor.state_dir / "attempts" / ts
     ensure_dir(d)
-    return d
+    # Resolved once here; Path.resolve stats every component, and the repair
+    # path builds a dozen artifact paths off this directory.
+    return d.resolve()
+
+
+class _AttemptWriter:
+    """Drains attempt-file writes on a daemon thread.
 
+    Keeps the monitor thread from stalling on slow disks while it should be
+    probing. ``flush()`` blocks until everything submitted so far is on disk;
+    call it before anything that reads the files back (the AI repair stage
+    points Codex at the attempt dir) and before reporting an attempt done.
+    """
 
-def _write_attempt_file(dir_: Path, name: str, content: str) -> Path:
+    def __init__(self) -> None:
+        self._queue: "queue.Queue[tuple[Path, tuple[str, ...], bool]]" = queue.Queue()
+        self._thread: threading.Thread | None = None
+
+    def submit(self, path: Path, parts: tuple[str, ...], *, redact: bool) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._drain, name="fix-my-claw-attempt-writer", daemon=True
+            )
+            self._thread.start()
+        self._queue.put((path, parts, redact))
+
+    def flush(self) -> None:
+        if self._thread is not None:
+            self._queue.join()
+
+    def _drain(self) -> None:
+        while True:
+            path, parts, redact = self._queue.get()
+            try:
+                # Redaction runs here, off the monitor thread, so the regex
+                # sweeps over large log bodies overlap with probing instead
+                # of serializing in front of it.
+                if redact:
+                    parts = tuple(redact_text(x) for x in parts)
+                _write_file_now(path, "".join(parts) if len(parts) != 1 else parts[0])
+            except Exception:
+                logging.getLogger("fix_my_claw").exception("attempt file write failed: %s", path)
+            finally:
+                self._queue.task_done()
+
+
+_ATTEMPT_WRITER = _AttemptWriter()
+atexit.register(_ATTEMPT_WRITER.flush)
+
+
+def _write_file_now(p: Path, content: str) -> None:
+    # Raw os-level open/write: one write syscall per artifact instead of the
+    # buffered TextIOWrapper stack that Path.write_text sets up and tears
+    # down. Attempt dirs see a dozen of these per repair.
+    fd = os.open(p, os.O_CREAT | os.O_WRONLY | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, content.encode("utf-8"))
+    finally:
+        os.close(fd)
+
+
+def _write_attempt_file(dir_: Path, name: str, *parts: str, redact: bool = False) -> Path:
     p = dir_ / name
-    p.write_text(content, encoding="utf-8")
+    _ATTEMPT_WRITER.submit(p, parts, redact=redact)
     return p
 
 
-def _collect_context(cfg: AppConfig, attempt_dir: Path) -> dict:
-    health = probe_health(cfg, log_on_fail=False)
-    status = probe_status(cfg, log_on_fail=False)
-    logs = probe_logs(cfg, timeout_seconds=cfg.monitor.probe_timeout_seconds)
-
-    _write_attempt_file(attempt_dir, "health.stdout.txt", redact_text(health.cmd.stdout))
-    _write_attempt_file(attempt_dir, "health.stderr.txt", redact_text(health.cmd.stderr))
-    _write_attempt_file(attempt_dir, "status.stdout.txt", redact_text(status.cmd.stdout))
-    _write_attempt_file(attempt_dir, "status.stderr.txt", redact_text(status.cmd.stderr))
-    _write_attempt_file(attempt_dir, "openclaw.logs.txt", redact_text(logs.stdout + ("\n" + logs.stderr if logs.stderr else "")))
+def _collect_context(
+    cfg: AppConfig,
+    attempt_dir: Path,
+    *,
+    cwd: Path | None = _CWD_UNSET,
+    probes: "tuple[Probe, Probe] | None" = None,
+) -> tuple[dict, bool]:
+    """Snapshot probe output into ``attempt_dir``.
+
+    Returns the context dict plus a healthy flag derived from the probes it
+    already ran, so callers don't re-probe just to ask "did that fix it?".
+    Callers that already hold a fresh probe pair pass it via ``probes`` to
+    avoid re-running it.
+    """
+    if cwd is _CWD_UNSET:
+        cwd = _dir_or_none(cfg.openclaw.workspace_dir)
+    if probes is None:
+        health, status = probe_health_and_status(cfg, log_on_fail=False, cwd=cwd)
+    else:
+        health, status = probes
+    logs = probe_logs(cfg, timeout_seconds=cfg.monitor.probe_timeout_seconds, cwd=cwd)
+
+    _write_attempt_file(attempt_dir, "health.stdout.txt", health.cmd.stdout, redact=True)
+    _write_attempt_file(attempt_dir, "health.stderr.txt", health.cmd.stderr, redact=True)
+    _write_attempt_file(attempt_dir, "status.stdout.txt", status.cmd.stdout, redact=True)
+    _write_attempt_file(attempt_dir, "status.stderr.txt", status.cmd.stderr, redact=True)
+    # Parts are redacted individually and joined once inside the writer, so
+    # no concatenated copy of the combined log blob is ever materialized on
+    # this thread.
+    if logs.stderr:
+        _write_attempt_file(attempt_dir, "openclaw.logs.txt", logs.stdout, "\n", logs.stderr, redact=True)
+    else:
+        _write_attempt_file(attempt_dir, "openclaw.logs.txt", logs.stdout, redact=True)
 
-    return {
+    ctx = {
         "health": health.to_json(),
         "status": status.to_json(),
         "logs": {
@@ -647,24 +1257,30 @@ def _collect_context(cfg: AppConfig, attempt_dir: Path) -> dict:
             "exit_code": logs.exit_code,
             "duration_ms": logs.duration_ms,
             "argv": logs.argv,
-            "stdout_path": str((attempt_dir / "openclaw.logs.txt").resolve()),
+            "stdout_path": str(attempt_dir / "openclaw.logs.txt"),
         },
-        "attempt_dir": str(attempt_dir.resolve()),
+        "attempt_dir": str(attempt_dir),
     }
+    return ctx, health.ok and status.ok
 
 
-def _probe_is_healthy(cfg: AppConfig) -> bool:
-    return probe_health(cfg, log_on_fail=False).ok and probe_status(cfg, log_on_fail=False).ok
+def _run_official_steps(
+    cfg: AppConfig, attempt_dir: Path, *, cwd: Path | None = _CWD_UNSET
+) -> tuple[list[dict], bool]:
+    """Run the configured official steps, returning (results, healthy).
 
-
-def _run_official_steps(cfg: AppConfig, attempt_dir: Path) -> list[dict]:
+    ``healthy`` carries the outcome of the last post-step probe pair out to
+    the caller so it isn't repeated there.
+    """
     repair_log = logging.getLogger("fix_my_claw.repair")
     results: list[dict] = []
-    total = len(cfg.repair.official_steps)
-    for idx, step in enumerate(cfg.repair.official_steps, start=1):
-        argv = [cfg.openclaw.command if step and step[0] == "openclaw" else step[0], *step[1:]]
+    healthy = False
+    total = len(cfg.resolved.official)
+    if cwd is _CWD_UNSET:
+        cwd = _dir_or_none(cfg.openclaw.workspace_dir)
+    for idx, step in enumerate(cfg.resolved.official, start=1):
+        argv = list(step)
         repair_log.warning("official step %d/%d: %s", idx, total, " ".join(argv))
-        cwd = cfg.openclaw.workspace_dir if cfg.openclaw.workspace_dir.exists() else None
         res = run_cmd(argv, timeout_seconds=cfg.repair.step_timeout_seconds, cwd=cwd)
         repair_log.warning(
             "official step %d/%d done: exit=%s duration_ms=%s",
@@ -675,28 +1291,42 @@ def _run_official_steps(cfg: AppConfig, attempt_dir: Path) -> list[dict]:
         )
         if res.stderr:
             repair_log.info("official step %d/%d stderr: %s", idx, total, truncate_for_log(res.stderr))
-        _write_attempt_file(attempt_dir, f"official.{idx}.stdout.txt", redact_text(res.stdout))
-        _write_attempt_file(attempt_dir, f"official.{idx}.stderr.txt", redact_text(res.stderr))
+        _write_attempt_file(attempt_dir, f"official.{idx}.stdout.txt", res.stdout, redact=True)
+        _write_attempt_file(attempt_dir, f"official.{idx}.stderr.txt", res.stderr, redact=True)
         results.append(
             {
                 "argv": res.argv,
                 "exit_code": res.exit_code,
                 "duration_ms": res.duration_ms,
-                "stdout_path": str((attempt_dir / f"official.{idx}.stdout.txt").resolve()),
-                "stderr_path": str((attempt_dir / f"official.{idx}.stderr.txt").resolve()),
+                "stdout_path": str(attempt_dir / f"official.{idx}.stdout.txt"),
+                "stderr_path": str(attempt_dir / f"official.{idx}.stderr.txt"),
             }
         )
         time.sleep(cfg.repair.post_step_wait_seconds)
-        if _probe_is_healthy(cfg):
+        healthy = (
+            probe_health(cfg, log_on_fail=False, cwd=cwd).ok
+            and probe_status(cfg, log_on_fail=False, cwd=cwd).ok
+        )
+        if healthy:
             repair_log.warning("OpenClaw is healthy after official step %d/%d", idx, total)
             break
-    return results
+    return results, healthy
 
 
-def _load_prompt_text(name: str) -> str:
+@functools.lru_cache(maxsize=8)
+def _load_prompt_template(name: str) -> "Template":
+    # Prompts are immutable package data; cache the compiled Template so
+    # repeated AI attempts skip the importlib.resources walk and file read.
     from importlib.resources import files
+    from string import Template
+
+    return Template((files("fix_my_claw.prompts") / name).read_text(encoding="utf-8"))
 
-    return (files("fix_my_claw.prompts") / name).read_text(encoding="utf-8")
+
+# Matches $var and ${var} for the fixed placeholder set; one precompiled scan
+# replaces the per-arg string.Template construction (which compiles its own
+# regex every call).
+_AI_VAR_RE = re.compile(r"\$\{?(workspace_dir|openclaw_state_dir|monitor_state_dir)\b\}?")
 
 
 def _build_ai_cmd(cfg: AppConfig, *, code_stage: bool) -> list[str]:
@@ -706,7 +1336,9 @@ def _build_ai_cmd(cfg: AppConfig, *, code_stage: bool) -> list[str]:
         "monitor_state_dir": str(cfg.monitor.state_dir),
     }
     args = cfg.ai.args_code if code_stage else cfg.ai.args
-    rendered = [Template(x).safe_substitute(vars) for x in args]
+    # Placeholders are already resolved at load_config time; the substitution
+    # here only fires for configs built directly (e.g. AppConfig() defaults).
+    rendered = [_AI_VAR_RE.sub(lambda m: vars[m.group(1)], x) if "$" in x else x for x in args]
     argv = [cfg.ai.command]
     if cfg.ai.model:
         argv += ["-m", cfg.ai.model]
@@ -716,9 +1348,9 @@ def _build_ai_cmd(cfg: AppConfig, *, code_stage: bool) -> list[str]:
 
 def _run_ai_repair(cfg: AppConfig, attempt_dir: Path, *, code_stage: bool) -> CmdResult:
     prompt_name = "repair_code.md" if code_stage else "repair.md"
-    prompt = Template(_load_prompt_text(prompt_name)).safe_substitute(
+    prompt = _load_prompt_template(prompt_name).safe_substitute(
         {
-            "attempt_dir": str(attempt_dir.resolve()),
+            "attempt_dir": str(attempt_dir),
             "workspace_dir": str(cfg.openclaw.workspace_dir),
             "openclaw_state_dir": str(cfg.openclaw.state_dir),
             "monitor_state_dir": str(cfg.monitor.state_dir),
@@ -728,6 +1360,10 @@ def _run_ai_repair(cfg: AppConfig, attempt_dir: Path, *, code_stage: bool) -> Cm
         }
     )
 
+    # The prompt points the AI at files in attempt_dir; make sure the
+    # background writer has landed them before the subprocess starts.
+    _ATTEMPT_WRITER.flush()
+
     argv = _build_ai_cmd(cfg, code_stage=code_stage)
     logging.getLogger("fix_my_claw.repair").warning(
         "AI repair (%s) starting: %s", "code" if code_stage else "config", argv
@@ -735,12 +1371,12 @@ def _run_ai_repair(cfg: AppConfig, attempt_dir: Path, *, code_stage: bool) -> Cm
     res = run_cmd(
         argv,
         timeout_seconds=cfg.ai.timeout_seconds,
-        cwd=cfg.openclaw.workspace_dir if cfg.openclaw.workspace_dir.exists() else None,
+        cwd=_dir_or_none(cfg.openclaw.workspace_dir),
         stdin_text=prompt,
     )
     _write_attempt_file(attempt_dir, "ai.argv.txt", " ".join(argv))
-    _write_attempt_file(attempt_dir, "ai.stdout.txt", redact_text(res.stdout))
-    _write_attempt_file(attempt_dir, "ai.stderr.txt", redact_text(res.stderr))
+    _write_attempt_file(attempt_dir, "ai.stdout.txt", res.stdout, redact=True)
+    _write_attempt_file(attempt_dir, "ai.stderr.txt", res.stderr, redact=True)
     logging.getLogger("fix_my_claw.repair").warning("AI repair done: exit=%s", res.exit_code)
     if res.stderr:
         logging.getLogger("fix_my_claw.repair").warning("AI stderr: %s", truncate_for_log(res.stderr))
@@ -749,7 +1385,9 @@ def _run_ai_repair(cfg: AppConfig, attempt_dir: Path, *, code_stage: bool) -> Cm
 
 def attempt_repair(cfg: AppConfig, store: StateStore, *, force: bool) -> RepairResult:
     repair_log = logging.getLogger("fix_my_claw.repair")
-    if _probe_is_healthy(cfg):
+    now = _now_ts()
+    wd = _dir_or_none(cfg.openclaw.workspace_dir)
+    if probe_health(cfg, log_on_fail=False, cwd=wd).ok and probe_status(cfg, log_on_fail=False, cwd=wd).ok:
         repair_log.info("repair skipped: already healthy")
         return RepairResult(attempted=False, fixed=True, used_ai=False, details={"already_healthy": True})
 
@@ -757,11 +1395,11 @@ def attempt_repair(cfg: AppConfig, store: StateStore, *, force: bool) -> RepairR
         repair_log.warning("repair skipped: disabled by config")
         return RepairResult(attempted=False, fixed=False, used_ai=False, details={"repair_disabled": True})
 
-    if not store.can_attempt_repair(cfg.monitor.repair_cooldown_seconds, force=force):
+    if not store.can_attempt_repair(cfg.monitor.repair_cooldown_seconds, force=force, now=now):
         details: dict[str, object] = {"cooldown": True}
         state = store.load()
         if state.last_repair_ts is not None:
-            elapsed = _now_ts() - state.last_repair_ts
+            elapsed = now - state.last_repair_ts
             remaining = max(0, cfg.monitor.repair_cooldown_seconds - elapsed)
             details["cooldown_remaining_seconds"] = remaining
             repair_log.info("repair skipped: cooldown (%ss remaining)", remaining)
@@ -769,17 +1407,27 @@ def attempt_repair(cfg: AppConfig, store: StateStore, *, force: bool) -> RepairR
             repair_log.info("repair skipped: cooldown")
         return RepairResult(attempted=False, fixed=False, used_ai=False, details=details)
 
-    store.mark_repair_attempt()
-    attempt_dir = _attempt_dir(cfg)
-    details: dict = {"attempt_dir": str(attempt_dir.resolve())}
-    repair_log.warning("starting repair attempt: dir=%s", attempt_dir.resolve())
-
-    details["context_before"] = _collect_context(cfg, attempt_dir)
-    details["official"] = _run_official_steps(cfg, attempt_dir)
-    details["context_after_official"] = _collect_context(cfg, attempt_dir)
+    store.mark_repair_attempt(now=now)
+    attempt_dir = _attempt_dir(cfg, now=now)
+    details: dict = {"attempt_dir": str(attempt_dir)}
+    repair_log.warning("starting repair attempt: dir=%s", attempt_dir)
+
+    details["context_before"], _ = _collect_context(cfg, attempt_dir, cwd=wd)
+    details["official"], steps_healthy = _run_official_steps(cfg, attempt_dir, cwd=wd)
+
+    if steps_healthy:
+        # The post-step probes just confirmed recovery; a full context
+        # collection (another probe round, a logs spawn, five file writes)
+        # would only duplicate the before-context on a healthy gateway.
+        details["context_after_official"] = {"skipped": "healthy"}
+        repair_log.warning("recovered by official steps: dir=%s", attempt_dir)
+        _ATTEMPT_WRITER.flush()
+        return RepairResult(attempted=True, fixed=True, used_ai=False, details=details)
 
-    if _probe_is_healthy(cfg):
-        repair_log.warning("recovered by official steps: dir=%s", attempt_dir.resolve())
+    details["context_after_official"], healthy = _collect_context(cfg, attempt_dir, cwd=wd)
+    if healthy:
+        repair_log.warning("recovered by official steps: dir=%s", attempt_dir)
+        _ATTEMPT_WRITER.flush()
         return RepairResult(attempted=True, fixed=True, used_ai=False, details=details)
 
     used_ai = False
@@ -788,6 +1436,7 @@ def attempt_repair(cfg: AppConfig, store: StateStore, *, force: bool) -> RepairR
     elif not store.can_attempt_ai(
         max_attempts_per_day=cfg.ai.max_attempts_per_day,
         cooldown_seconds=cfg.ai.cooldown_seconds,
+        now=_now_ts(),
     ):
         repair_log.warning("Codex-assisted remediation skipped (rate limit / cooldown)")
     else:
@@ -795,22 +1444,34 @@ def attempt_repair(cfg: AppConfig, store: StateStore, *, force: bool) -> RepairR
         used_ai = True
         details["ai_stage"] = "config"
         details["ai_result_config"] = _run_ai_repair(cfg, attempt_dir, code_stage=False).__dict__
-        details["context_after_ai_config"] = _collect_context(cfg, attempt_dir)
-        if _probe_is_healthy(cfg):
-            repair_log.warning("recovered by Codex-assisted remediation: dir=%s", attempt_dir.resolve())
+        probes = probe_health_and_status(cfg, log_on_fail=False, cwd=wd)
+        healthy = probes[0].ok and probes[1].ok
+        if healthy:
+            details["context_after_ai_config"] = {"skipped": "healthy"}
+            repair_log.warning("recovered by Codex-assisted remediation: dir=%s", attempt_dir)
+            _ATTEMPT_WRITER.flush()
             return RepairResult(attempted=True, fixed=True, used_ai=True, details=details)
+        details["context_after_ai_config"], _ = _collect_context(cfg, attempt_dir, cwd=wd, probes=probes)
 
         if cfg.ai.allow_code_changes:
             details["ai_stage"] = "code"
             details["ai_result_code"] = _run_ai_repair(cfg, attempt_dir, code_stage=True).__dict__
-            details["context_after_ai_code"] = _collect_context(cfg, attempt_dir)
-
-    fixed = _probe_is_healthy(cfg)
+            probes = probe_health_and_status(cfg, log_on_fail=False, cwd=wd)
+            healthy = probes[0].ok and probes[1].ok
+            if healthy:
+                details["context_after_ai_code"] = {"skipped": "healthy"}
+            else:
+                details["context_after_ai_code"], _ = _collect_context(cfg, attempt_dir, cwd=wd, probes=probes)
+
+    # `healthy` reflects the most recent probe round of whichever stage ran
+    # last, so no extra probe pair is needed to decide the outcome.
+    fixed = healthy
+    _ATTEMPT_WRITER.flush()
     repair_log.warning(
         "repair attempt finished: fixed=%s used_codex=%s dir=%s",
         fixed,
         used_ai,
-        attempt_dir.resolve(),
+        attempt_dir,
     )
     return RepairResult(attempted=True, fixed=fixed, used_ai=used_ai, details=details)
 
@@ -818,31 +1479,50 @@ def attempt_repair(cfg: AppConfig, store: StateStore, *, force: bool) -> RepairR
 def monitor_loop(cfg: AppConfig, store: StateStore) -> None:
     wd_log = logging.getLogger("fix_my_claw.watchdog")
     wd_log.info("starting monitor loop: interval=%ss", cfg.monitor.interval_seconds)
+    interval = cfg.monitor.interval_seconds
+    deadline = time.monotonic()
+    behind = 0
     while True:
         try:
-            result = run_check(cfg, store)
-            if not result.healthy:
-                wd_log.warning(
-                    "unhealthy: health_exit=%s status_exit=%s; attempting repair",
-                    result.health.get("exit_code"),
-                    result.status.get("exit_code"),
-                )
-                rr = attempt_repair(cfg, store, force=False)
-                if rr.attempted:
+            with store.transaction():
+                result = run_check(cfg, store)
+                if not result.healthy:
                     wd_log.warning(
-                        "repair finished: fixed=%s used_codex=%s dir=%s",
-                        rr.fixed,
-                        rr.used_ai,
-                        rr.details.get("attempt_dir"),
+                        "unhealthy: health_exit=%s status_exit=%s; attempting repair",
+                        result.health.get("exit_code"),
+                        result.status.get("exit_code"),
                     )
-                elif rr.details.get("cooldown"):
-                    remaining = rr.details.get("cooldown_remaining_seconds")
-                    wd_log.info("repair skipped: cooldown (%ss remaining)", remaining if remaining is not None else "?")
-                else:
-                    wd_log.info("repair skipped: %s", rr.details)
+                    rr = attempt_repair(cfg, store, force=False)
+                    if rr.attempted:
+                        wd_log.warning(
+                            "repair finished: fixed=%s used_codex=%s dir=%s",
+                            rr.fixed,
+                            rr.used_ai,
+                            rr.details.get("attempt_dir"),
+                        )
+                    elif rr.details.get("cooldown"):
+                        remaining = rr.details.get("cooldown_remaining_seconds")
+                        wd_log.info("repair skipped: cooldown (%ss remaining)", remaining if remaining is not None else "?")
+                    else:
+                        wd_log.info("repair skipped: %s", rr.details)
         except Exception as e:
             wd_log.exception("monitor loop error: %s", e)
-        time.sleep(cfg.monitor.interval_seconds)
+        # Sleep to the next deadline rather than a fixed interval, so the
+        # cadence stays flat instead of drifting by the check duration. When
+        # a cycle overruns (slow probes, a repair attempt), re-anchor instead
+        # of bursting catch-up iterations.
+        deadline += interval
+        remaining = deadline - time.monotonic()
+        if remaining > 0:
+            behind = 0
+            time.sleep(remaining)
+        else:
+            behind += 1
+            if behind >= 3:
+                wd_log.warning(
+                    "monitor running behind schedule by %.1fs (interval=%ss)", -remaining, interval
+                )
+            deadline = time.monotonic()
 
 
 def _default_config_path() -> str:
@@ -873,41 +1553,52 @@ def cmd_init(args: argparse.Namespace) -> int:
     return 0
 
 
+def cmd_compile_config(args: argparse.Namespace) -> int:
+    p = write_config_snapshot(args.config)
+    print(str(p))
+    return 0
+
+
+# The cmd_* entry points all repeat the load-config/setup-logging/StateStore
+# dance; memoized so repeated invocations in one process (tests, `up` restart
+# loops) skip the TOML parse and handler construction. Lock acquisition stays
+# per-call in the commands that need it.
+@functools.lru_cache(maxsize=4)
+def _prepare(config_path: str, *, init_if_missing: bool = False, file_logging: bool = True) -> "tuple[AppConfig, StateStore]":
+    cfg = _load_or_init_config(config_path, init_if_missing=init_if_missing)
+    setup_logging(cfg, file_logging=file_logging)
+    return cfg, StateStore(cfg.monitor.state_dir)
+
+
 def cmd_check(args: argparse.Namespace) -> int:
-    cfg = _load_or_init_config(args.config, init_if_missing=False)
-    setup_logging(cfg)
-    store = StateStore(cfg.monitor.state_dir)
+    cfg, store = _prepare(args.config, file_logging=False)
     result = run_check(cfg, store)
     if args.json:
-        print(json.dumps(result.to_json(), ensure_ascii=False))
+        sys.stdout.write(_json_dumps(result.to_json()) + "\n")
     return 0 if result.healthy else 1
 
 
 def cmd_repair(args: argparse.Namespace) -> int:
-    cfg = _load_or_init_config(args.config, init_if_missing=False)
-    setup_logging(cfg)
+    cfg, store = _prepare(args.config)
     lock = FileLock(cfg.monitor.state_dir / "fix-my-claw.lock")
     if not lock.acquire(timeout_seconds=0):
         print("another fix-my-claw instance is running", file=sys.stderr)
         return 2
-    store = StateStore(cfg.monitor.state_dir)
     try:
         result = attempt_repair(cfg, store, force=args.force)
     finally:
         lock.release()
     if args.json:
-        print(json.dumps(result.to_json(), ensure_ascii=False))
+        sys.stdout.write(_json_dumps(result.to_json()) + "\n")
     return 0 if result.fixed else 1
 
 
 def cmd_monitor(args: argparse.Namespace) -> int:
-    cfg = _load_or_init_config(args.config, init_if_missing=False)
-    setup_logging(cfg)
+    cfg, store = _prepare(args.config)
     lock = FileLock(cfg.monitor.state_dir / "fix-my-claw.lock")
     if not lock.acquire(timeout_seconds=0):
         print("another fix-my-claw instance is running", file=sys.stderr)
         return 2
-    store = StateStore(cfg.monitor.state_dir)
     try:
         monitor_loop(cfg, store)
     finally:
@@ -916,13 +1607,11 @@ def cmd_monitor(args: argparse.Namespace) -> int:
 
 
 def cmd_up(args: argparse.Namespace) -> int:
-    cfg = _load_or_init_config(args.config, init_if_missing=True)
-    setup_logging(cfg)
+    cfg, store = _prepare(args.config, init_if_missing=True)
     lock = FileLock(cfg.monitor.state_dir / "fix-my-claw.lock")
     if not lock.acquire(timeout_seconds=0):
         print("another fix-my-claw instance is running", file=sys.stderr)
         return 2
-    store = StateStore(cfg.monitor.state_dir)
     try:
         monitor_loop(cfg, store)
     finally:
@@ -930,7 +1619,10 @@ def cmd_up(args: argparse.Namespace) -> int:
     return 0
 
 
-def build_parser() -> argparse.ArgumentParser:
+@functools.lru_cache(maxsize=1)
+def build_parser() -> "argparse.ArgumentParser":
+    import argparse
+
     p = argparse.ArgumentParser(prog="fix-my-claw")
     sub = p.add_subparsers(dest="cmd", required=True)
 
@@ -958,11 +1650,65 @@ def build_parser() -> argparse.ArgumentParser:
     _add_config_arg(p_mon)
     p_mon.set_defaults(func=cmd_monitor)
 
+    p_cc = sub.add_parser("compile-config", help="Pre-parse config into a pickle sidecar for faster startup.")
+    _add_config_arg(p_cc)
+    p_cc.set_defaults(func=cmd_compile_config)
+
     return p
 
 
+# Subcommands handled by the fast-path dispatcher and the boolean flags each
+# one accepts. Anything else (help, typos, abbreviated flags) falls back to
+# argparse, which stays lazily imported inside build_parser.
+_FAST_COMMANDS: dict[str, tuple[Any, frozenset[str]]] = {
+    "up": (cmd_up, frozenset()),
+    "init": (cmd_init, frozenset({"--force"})),
+    "check": (cmd_check, frozenset({"--json"})),
+    "repair": (cmd_repair, frozenset({"--force", "--json"})),
+    "monitor": (cmd_monitor, frozenset()),
+    "compile-config": (cmd_compile_config, frozenset()),
+}
+
+
+def _fast_parse(argv: list[str]) -> SimpleNamespace | None:
+    if not argv:
+        return None
+    entry = _FAST_COMMANDS.get(argv[0])
+    if entry is None:
+        return None
+    func, flags = entry
+    ns = SimpleNamespace(
+        cmd=argv[0],
+        func=func,
+        config=_default_config_path(),
+        json=False,
+        force=False,
+    )
+    rest = argv[1:]
+    i = 0
+    while i < len(rest):
+        tok = rest[i]
+        if tok == "--config":
+            if i + 1 >= len(rest):
+                return None
+            ns.config = rest[i + 1]
+            i += 2
+        elif tok.startswith("--config="):
+            ns.config = tok.split("=", 1)[1]
+            i += 1
+        elif tok in flags:
+            setattr(ns, tok[2:], True)
+            i += 1
+        else:
+            return None
+    return ns
+
+
 def main(argv: list[str] | None = None) -> None:
-    parser = build_parser()
-    args = parser.parse_args(argv)
+    raw = list(sys.argv[1:]) if argv is None else list(argv)
+    args = _fast_parse(raw)
+    if args is None:
+        parser = build_parser()
+        args = parser.parse_args(raw)
     code = args.func(args)
     raise SystemExit(code)